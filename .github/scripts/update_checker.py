@@ -6,15 +6,53 @@
 """
 
 import re
+import string
 import sys
 import os
 import yaml
 import hashlib
+import urllib.parse
 import urllib.request
-import urllib.error
+import urllib3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-import json
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+
+# 计算哈希时的分块大小
+HASH_CHUNK_SIZE = 1 << 20
+
+# 并发计算哈希值的最大线程数
+HASH_MAX_WORKERS = 8
+
+# HTTP请求重试策略，重定向单独计数，避免代理跳转占用重试次数
+HTTP_RETRIES = urllib3.Retry(total=None, connect=3, read=3, redirect=10)
+
+# source中记录的远程文件信息字段，与fetch_etag()返回值一一对应
+REMOTE_META_KEYS = ("etag", "content_length", "last_modified")
+
+# Vivaldi特定版本号模式 - 提取完整的4位版本号如 7.7.3851.52
+_VIVALDI_RE = re.compile(r"(\d+\.\d+\.\d+\.\d+)")
+
+# 常见版本号模式（备用），一次扫描取最靠左的匹配：点分版本号如 1.2.3 或4位数字如 4200，
+# 仅在同一起始位置上点分版本号优先，如 x_2024_1.2.3.deb 返回 2024
+_FALLBACK_RE = re.compile(r"(\d+(?:\.\d+)+)|(\d{4})")
+
+# 在原始YAML字节中定位顶层sources字段、其后的下一个顶层字段和source中的url
+_SOURCES_KEY_RE = re.compile(rb"^sources:", re.M)
+_TOP_LEVEL_KEY_RE = re.compile(rb"^[^\s#-]", re.M)
+_SOURCE_URL_RE = re.compile(rb"^[ \t-]*url:[ \t]*['\"]?([^\s'\"]+)", re.M)
 
 
 # Custom YAML representer for literal block style
@@ -23,10 +61,48 @@ class literal_str(str):
 
 
 def literal_str_presenter(dumper, data):
-    return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|")
+    # CSafeDumper只接受str本身，不接受其子类
+    return dumper.represent_scalar("tag:yaml.org,2002:str", str(data), style="|")
+
+
+_Dumper.add_representer(literal_str, literal_str_presenter)
+
 
+def load_yaml(path):
+    """读取并解析YAML文件"""
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f.read(), Loader=_Loader)
+
+
+def compile_url_template(template):
+    """预先检查下载地址模板，返回按version和arch生成URL的函数"""
+    try:
+        fields = list(string.Formatter().parse(template))
+    except ValueError:
+        # 格式错误的模板交给str.format，在调用时报错
+        return template.format
+
+    # 只含{version}和{arch}占位符的简单模板直接替换，其余情况仍交给str.format处理
+    if (
+        "{{" in template
+        or "}}" in template
+        or any(
+            name is not None and (name not in ("version", "arch") or spec or conversion)
+            for _, name, spec, conversion in fields
+        )
+    ):
+        return template.format
 
-yaml.add_representer(literal_str, literal_str_presenter)
+    def make_url(version, arch):
+        return template.replace("{arch}", arch).replace("{version}", version)
+
+    return make_url
+
+
+# 单个YAML文件的更新计划：待更新的source及其新的URL和文件名
+UpdatePlan = namedtuple(
+    "UpdatePlan", "yaml_file yaml_data source arch name new_name new_url"
+)
 
 
 class UpdateChecker:
@@ -36,13 +112,61 @@ class UpdateChecker:
         self.app_name = self.config.get("app_name", "Unknown App")
         self.version_url = self.config.get("version_url", "")
         self.version_pattern = self.config.get("version_pattern", "")
+        self._version_re = re.compile(self.version_pattern)
         self.download_url_template = self.config.get("download_url_template", "")
+        self._make_download_url = compile_url_template(self.download_url_template)
+        # 复用连接池，对同一主机的多次请求只需一次TCP/TLS握手
+        self.http = urllib3.PoolManager(maxsize=HASH_MAX_WORKERS, retries=HTTP_RETRIES)
+        # 与urllib一样遵循http_proxy/https_proxy环境变量
+        self._proxy_pools = self._make_proxy_pools()
+        # 包版本号最后一位使用的日期，每次run()时刷新
+        self._today = datetime.now().strftime("%m%d")
+
+    def _make_proxy_pools(self):
+        """按协议为环境变量中配置的代理创建连接池，同一代理共用一个连接池"""
+        pools = {}
+        managers = {}
+        for scheme, proxy_url in urllib.request.getproxies().items():
+            if scheme not in ("http", "https"):
+                continue
+            if "://" not in proxy_url:
+                proxy_url = "http://" + proxy_url
+            proxy = urllib3.util.parse_url(proxy_url)
+            if proxy.scheme not in ("http", "https"):
+                # urllib3不支持socks等代理协议，忽略该代理直接连接
+                print(f"不支持的代理协议，已忽略: {proxy.scheme}://{proxy.netloc}")
+                continue
+            if proxy_url not in managers:
+                # ProxyManager不会从URL中读取代理认证信息，需要单独生成认证头
+                proxy_headers = None
+                if proxy.auth:
+                    user, _, password = proxy.auth.partition(":")
+                    proxy_headers = urllib3.make_headers(
+                        proxy_basic_auth=urllib.parse.unquote(user)
+                        + ":"
+                        + urllib.parse.unquote(password)
+                    )
+                managers[proxy_url] = urllib3.ProxyManager(
+                    proxy._replace(auth=None).url,
+                    proxy_headers=proxy_headers,
+                    maxsize=HASH_MAX_WORKERS,
+                    retries=HTTP_RETRIES,
+                )
+            pools[scheme] = managers[proxy_url]
+        return pools
+
+    def _request(self, method, url, **kwargs):
+        """发送HTTP请求，配置了代理且不在no_proxy中的请求经代理发送"""
+        parts = urllib.parse.urlsplit(url)
+        pool = self._proxy_pools.get(parts.scheme)
+        if pool is None or urllib.request.proxy_bypass(parts.hostname or ""):
+            pool = self.http
+        return pool.request(method, url, **kwargs)
 
     def load_config(self, config_file):
         """加载配置文件"""
         try:
-            with open(config_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _json.loads(Path(config_file).read_bytes())
         except Exception as e:
             print(f"加载配置文件失败: {e}")
             sys.exit(1)
@@ -54,16 +178,19 @@ class UpdateChecker:
                 print("未配置版本检查URL")
                 return None
 
-            with urllib.request.urlopen(self.version_url) as response:
-                html = response.read().decode("utf-8")
+            response = self._request("GET", self.version_url)
+            if response.status >= 400:
+                print(f"获取版本页面失败: HTTP {response.status}")
+                return None
+            html = response.data.decode("utf-8")
 
-            version_match = re.search(self.version_pattern, html)
+            version_match = self._version_re.search(html)
             if version_match:
                 return version_match.group(1)
             else:
                 print(f"无法从页面解析版本号")
                 return None
-        except urllib.error.URLError as e:
+        except urllib3.exceptions.HTTPError as e:
             print(f"获取版本页面失败: {e}")
             return None
 
@@ -71,34 +198,69 @@ class UpdateChecker:
         """计算远程文件的SHA256哈希值"""
         try:
             print(f"正在计算文件哈希值: {url}")
-            with urllib.request.urlopen(url) as response:
+            response = self._request("GET", url, preload_content=False)
+            try:
+                if response.status >= 400:
+                    print(f"下载文件失败: HTTP {response.status}")
+                    response.drain_conn()
+                    return None
+
                 sha256_hash = hashlib.sha256()
-                for chunk in iter(lambda: response.read(4096), b""):
+                for chunk in response.stream(HASH_CHUNK_SIZE):
                     sha256_hash.update(chunk)
                 return sha256_hash.hexdigest()
-        except urllib.error.URLError as e:
+            finally:
+                response.release_conn()
+        except Exception as e:
             print(f"下载文件失败: {e}")
             return None
 
+    def fetch_etag(self, url):
+        """通过HEAD请求获取远程文件的(ETag, Content-Length, Last-Modified)，无法确认时返回None"""
+        try:
+            response = self._request("HEAD", url)
+        except Exception as e:
+            print(f"获取文件ETag失败: {e}")
+            return None
+
+        if response.status >= 400:
+            print(f"获取文件ETag失败: HTTP {response.status}")
+            return None
+
+        # 弱ETag不保证文件内容逐字节一致，不能用来复用哈希值
+        etag = response.headers.get("ETag")
+        if not etag or etag.startswith("W/"):
+            return None
+
+        # ETag只对单个资源有意义，换了URL时至少还要求文件大小一致
+        content_length = response.headers.get("Content-Length")
+        if not content_length or not content_length.isdigit():
+            return None
+
+        return etag, int(content_length), response.headers.get("Last-Modified")
+
+    def fetch_source_digest(self, plan):
+        """获取新文件的哈希值和远程文件信息，URL或远程文件信息未变时直接复用原哈希值"""
+        old_digest = plan.source.get("digest")
+        old_meta = tuple(plan.source.get(key) for key in REMOTE_META_KEYS)
+        if plan.new_url == plan.source.get("url") and old_digest:
+            print(f"  {plan.arch} 文件URL未变化，复用已有哈希值: {plan.new_url}")
+            return old_digest, old_meta
+
+        meta = self.fetch_etag(plan.new_url)
+        if meta and meta == old_meta and old_digest:
+            print(f"  {plan.arch} 文件ETag和大小未变化，复用已有哈希值: {plan.new_url}")
+            return old_digest, meta
+
+        return self.calculate_sha256(plan.new_url), meta
+
     def update_package_version(self, yaml_data, new_build_version):
         """更新package字段中的version"""
         try:
-            version_parts = str(new_build_version).split(".")
-            current_date = datetime.now().strftime("%m%d")
-
-            # 确保版本号格式为：前三位使用传进来的build_version，最后一位使用当前日期
-            if len(version_parts) >= 3:
-                # 如果传入的版本已经有3位或更多，取前三位，最后一位用日期
-                new_version = f"{version_parts[0]}.{version_parts[1]}.{version_parts[2]}.{current_date}"
-            elif len(version_parts) == 2:
-                # 如果传入的版本有2位，补一位0，最后一位用日期
-                new_version = f"{version_parts[0]}.{version_parts[1]}.0.{current_date}"
-            elif len(version_parts) == 1:
-                # 如果传入的版本只有1位，补两位0，最后一位用日期
-                new_version = f"{version_parts[0]}.0.0.{current_date}"
-            else:
-                # 默认情况
-                new_version = f"{new_build_version}.0.0.{current_date}"
+            # 确保版本号格式为：前三位使用传进来的build_version（不足三位补0），
+            # 最后一位使用当前日期
+            parts = (str(new_build_version).split(".") + ["0", "0", "0"])[:3]
+            new_version = f"{parts[0]}.{parts[1]}.{parts[2]}.{self._today}"
 
             if "package" in yaml_data and isinstance(yaml_data["package"], dict):
                 yaml_data["package"]["version"] = new_version
@@ -113,34 +275,42 @@ class UpdateChecker:
 
     def extract_version_from_filename(self, filename):
         """从文件名提取版本号"""
-        # Vivaldi特定版本号模式 - 提取完整的4位版本号如 7.7.3851.52
-        vivaldi_pattern = r"(\d+\.\d+\.\d+\.\d+)"
-        match = re.search(vivaldi_pattern, filename)
+        match = _VIVALDI_RE.search(filename)
         if match:
             return match.group(1)
 
         # 如果Vivaldi模式不匹配，使用常见版本号模式（备用）
-        patterns = [
-            r"(\d{4})",  # 4位数字，如 4200
-            r"(\d+\.\d+\.\d+)",  # 标准版本号，如 1.2.3
-            r"(\d+\.\d+)",  # 两位版本号，如 1.2
-            r"(\d+(?:\.\d+)+)",  # 任意位版本号
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, filename)
-            if match:
-                return match.group(1)
+        match = _FALLBACK_RE.search(filename)
+        if match:
+            return match.group(1) or match.group(2)
 
         return None
 
+    def _scan_current_version(self, yaml_file):
+        """从YAML原始字节中sources下第一个url提取版本号，找不到时返回None"""
+        data = Path(yaml_file).read_bytes()
+        sources_match = _SOURCES_KEY_RE.search(data)
+        if not sources_match:
+            return None
+
+        # 只在sources字段范围内查找，避免匹配到其他字段中的url
+        next_key = _TOP_LEVEL_KEY_RE.search(data, sources_match.end())
+        end = next_key.start() if next_key else len(data)
+        url_match = _SOURCE_URL_RE.search(data, sources_match.end(), end)
+        if not url_match:
+            return None
+
+        return self.extract_version_from_filename(url_match.group(1).decode("utf-8"))
+
     def get_current_version_from_yaml(self, yaml_file):
         """从YAML文件中获取当前版本号"""
         try:
-            with open(yaml_file, "r", encoding="utf-8") as f:
-                content = f.read()
+            # 快速路径：直接在原始字节中找到第一个source的url，无需解析整个YAML
+            current_version = self._scan_current_version(yaml_file)
+            if current_version:
+                return current_version
 
-            yaml_data = yaml.safe_load(content)
+            yaml_data = load_yaml(yaml_file)
             sources = yaml_data.get("sources", [])
 
             if not sources:
@@ -159,21 +329,36 @@ class UpdateChecker:
             print(f"从{yaml_file}读取当前版本失败: {e}")
             return None
 
-    def update_yaml_file_with_github_url(self, yaml_file, new_version, github_url):
-        """使用GitHub URL更新YAML文件"""
-        try:
-            with open(yaml_file, "r", encoding="utf-8") as f:
-                content = f.read()
+    def build_github_url(self, github_url, arch):
+        """根据架构构建带代理前缀的GitHub下载URL"""
+        # 直接使用提供的GitHub URL，但需要替换架构
+        if "{arch}" in github_url:
+            new_url = github_url.replace("{arch}", arch)
+        else:
+            # 如果GitHub URL不包含{arch}占位符，根据架构调整URL
+            if arch == "arm64" and "amd64" in github_url:
+                new_url = github_url.replace("amd64", "arm64")
+            else:
+                new_url = github_url
+
+        # 添加代理前缀
+        proxy_prefix = "https://edgeone.gh-proxy.com/"
+        if not new_url.startswith(proxy_prefix):
+            new_url = proxy_prefix + new_url
+
+        return new_url
 
-            yaml_data = yaml.safe_load(content)
+    def plan_yaml_update(self, yaml_file, new_version, github_url=None):
+        """读取YAML文件，确定要更新的source及其新的URL和文件名"""
+        try:
+            yaml_data = load_yaml(yaml_file)
             sources = yaml_data.get("sources", [])
 
             if not sources:
                 print(f"{yaml_file}中没有找到sources，跳过")
-                return False
+                return None
 
-            # 查找并更新匹配的source
-            updated = False
+            # 查找匹配的source
             for i, source in enumerate(sources):
                 name = source.get("name", "")
                 url = source.get("url", "")
@@ -195,190 +380,143 @@ class UpdateChecker:
                 if "arm64" in url or "aarch64" in url:
                     arch = "arm64"
 
-                # 构建新的文件名
+                # 构建新的下载URL和文件名
+                if github_url:
+                    new_url = self.build_github_url(github_url, arch)
+                else:
+                    new_url = self._make_download_url(version=new_version, arch=arch)
                 new_name = name.replace(current_version, new_version)
 
-                # 直接使用提供的GitHub URL，但需要替换架构
-                if "{arch}" in github_url:
-                    new_url = github_url.replace("{arch}", arch)
-                else:
-                    # 如果GitHub URL不包含{arch}占位符，根据架构调整URL
-                    if arch == "arm64" and "amd64" in github_url:
-                        new_url = github_url.replace("amd64", "arm64")
-                    else:
-                        new_url = github_url
-
-                # 添加代理前缀
-                proxy_prefix = "https://edgeone.gh-proxy.com/"
-                if not new_url.startswith(proxy_prefix):
-                    new_url = proxy_prefix + new_url
-
-                # 计算哈希值（从GitHub下载的文件）
-                print(f"正在计算GitHub release文件的哈希值...")
-                new_digest = self.calculate_sha256(new_url)
-                if not new_digest:
-                    print(f"  无法计算GitHub文件的哈希值")
-                    continue
+                return UpdatePlan(
+                    yaml_file, yaml_data, source, arch, name, new_name, new_url
+                )
 
-                # 更新source
-                source["url"] = new_url
-                source["digest"] = new_digest
-                source["name"] = new_name
+            print("  没有找到可更新的source条目")
+            return None
 
-                updated = True
-                print(f"  已使用GitHub URL更新 {arch} 架构的source条目")
-                break
+        except Exception as e:
+            print(f"读取{yaml_file}失败: {e}")
+            return None
 
-            if not updated:
-                print("  没有找到可更新的source条目")
-                return False
+    def write_yaml_update(self, plan, new_version, new_digest, remote_meta=None):
+        """将更新计划和新的哈希值写回YAML文件"""
+        try:
+            yaml_data = plan.yaml_data
+
+            # 更新source
+            plan.source["url"] = plan.new_url
+            plan.source["digest"] = new_digest
+            plan.source["name"] = plan.new_name
+            # 记录远程文件信息，缺失的字段不能保留旧文件的值
+            remote_meta = remote_meta or (None,) * len(REMOTE_META_KEYS)
+            for key, value in zip(REMOTE_META_KEYS, remote_meta):
+                if value is not None:
+                    plan.source[key] = value
+                else:
+                    plan.source.pop(key, None)
+            print(f"  已更新 {plan.arch} 架构的source条目")
 
             # 更新package版本
             self.update_package_version(yaml_data, new_version)
 
-            # 同步更新build字段中的文件名
-            if updated and "build" in yaml_data and isinstance(yaml_data["build"], str):
-                build_content = yaml_data["build"]
-                # 直接使用新的name替换build字段中的文件名
-                # 查找包含旧版本号的文件名模式
-                old_filename_pattern = rf"{re.escape(name)}"
-                updated_build = re.sub(old_filename_pattern, new_name, build_content)
-
+            build_content = yaml_data.get("build")
+            if isinstance(build_content, str):
+                # 同步更新build字段中的文件名：直接使用新的name替换旧文件名
+                updated_build = build_content.replace(plan.name, plan.new_name)
                 if updated_build != build_content:
-                    yaml_data["build"] = updated_build
-                    print(f"  build字段文件名已同步更新: {new_name}")
+                    print(f"  build字段文件名已同步更新: {plan.new_name}")
 
-            # 保持YAML格式
-            if "build" in yaml_data and isinstance(yaml_data["build"], str):
-                yaml_data["build"] = literal_str(yaml_data["build"])
+                # 保持YAML格式
+                yaml_data["build"] = literal_str(updated_build)
 
             # 写回文件
-            updated_content = yaml.dump(
-                yaml_data, allow_unicode=True, default_flow_style=False, sort_keys=False
-            )
-            with open(yaml_file, "w", encoding="utf-8") as f:
-                f.write(updated_content)
+            with open(plan.yaml_file, "w", encoding="utf-8") as f:
+                yaml.dump(
+                    yaml_data,
+                    f,
+                    Dumper=_Dumper,
+                    allow_unicode=True,
+                    default_flow_style=False,
+                    sort_keys=False,
+                )
 
-            print(f"已使用GitHub URL更新{yaml_file}")
+            print(f"已更新{plan.yaml_file}")
             return True
 
         except Exception as e:
-            print(f"使用GitHub URL更新{yaml_file}失败: {e}")
+            print(f"更新{plan.yaml_file}失败: {e}")
             return False
 
-    def update_yaml_file(self, yaml_file, new_version):
-        """更新YAML文件"""
-        try:
-            with open(yaml_file, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            yaml_data = yaml.safe_load(content)
-            sources = yaml_data.get("sources", [])
-
-            if not sources:
-                print(f"{yaml_file}中没有找到sources，跳过")
-                return False
-
-            # 查找并更新匹配的source
-            updated = False
-            for i, source in enumerate(sources):
-                name = source.get("name", "")
-                url = source.get("url", "")
-
-                print(f"  检查source {i}: name='{name}', url='{url}'")
-
-                if not name or not url:
-                    print(f"  跳过source {i}: name或url为空")
-                    continue
-
-                # 提取当前版本号
-                current_version = self.extract_version_from_filename(url)
-                if not current_version:
-                    print(f"  无法从URL提取版本号: {url}")
-                    continue
-
-                # 检查架构
-                arch = "amd64"
-                if "arm64" in url or "aarch64" in url:
-                    arch = "arm64"
-
-                # 构建新的下载URL和文件名
-                new_url = self.download_url_template.format(
-                    version=new_version, arch=arch
-                )
-                new_name = name.replace(current_version, new_version)
-
-                # 计算哈希值
-                print(f"正在计算 {arch} 新版本的哈希值...")
-                new_digest = self.calculate_sha256(new_url)
-                if not new_digest:
-                    continue
-
-                # 更新source
-                source["url"] = new_url
-                source["digest"] = new_digest
-                source["name"] = new_name
-
-                updated = True
-                print(f"  已更新 {arch} 架构的source条目")
-                break
-
-            if not updated:
-                print("  没有找到可更新的source条目")
-                return False
+    def update_yaml_files(self, yaml_files, new_version, github_url=None):
+        """更新多个YAML文件，并发下载计算哈希值，返回成功更新的文件数"""
+        plans = []
+        for yaml_file in yaml_files:
+            print(f"\n处理 {yaml_file}...")
+            plan = self.plan_yaml_update(yaml_file, new_version, github_url)
+            if plan:
+                plans.append(plan)
 
-            # 更新package版本
-            self.update_package_version(yaml_data, new_version)
+        if not plans:
+            return 0
 
-            # 同步更新build字段中的文件名
-            if updated and "build" in yaml_data and isinstance(yaml_data["build"], str):
-                build_content = yaml_data["build"]
-                # 直接使用新的name替换build字段中的文件名
-                # 查找包含旧版本号的文件名模式
-                old_filename_pattern = rf"{re.escape(name)}"
-                updated_build = re.sub(old_filename_pattern, new_name, build_content)
+        # 各文件的下载互不依赖，并发计算哈希值
+        print(f"\n正在计算 {len(plans)} 个新文件的哈希值...")
+        max_workers = min(HASH_MAX_WORKERS, len(plans))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self.fetch_source_digest, plans))
 
-                if updated_build != build_content:
-                    yaml_data["build"] = updated_build
-                    print(f"  build字段文件名已同步更新: {new_name}")
+        success_count = 0
+        for plan, (new_digest, remote_meta) in zip(plans, results):
+            if not new_digest:
+                print(f"无法计算{plan.yaml_file}中 {plan.arch} 新文件的哈希值，跳过")
+                continue
+            if self.write_yaml_update(plan, new_version, new_digest, remote_meta):
+                success_count += 1
 
-            # 保持YAML格式
-            if "build" in yaml_data and isinstance(yaml_data["build"], str):
-                yaml_data["build"] = literal_str(yaml_data["build"])
+        return success_count
 
-            # 写回文件
-            updated_content = yaml.dump(
-                yaml_data, allow_unicode=True, default_flow_style=False, sort_keys=False
-            )
-            with open(yaml_file, "w", encoding="utf-8") as f:
-                f.write(updated_content)
-
-            print(f"已更新{yaml_file}")
-            return True
+    def update_yaml_file_with_github_url(self, yaml_file, new_version, github_url):
+        """使用GitHub URL更新YAML文件"""
+        return self.update_yaml_files([yaml_file], new_version, github_url) == 1
 
-        except Exception as e:
-            print(f"更新{yaml_file}失败: {e}")
-            return False
+    def update_yaml_file(self, yaml_file, new_version):
+        """更新YAML文件"""
+        return self.update_yaml_files([yaml_file], new_version) == 1
 
     def find_yaml_files(self):
         """自动查找YAML文件"""
         yaml_files = []
 
         # 查找主要的linglong.yaml
-        if Path("linglong.yaml").exists():
+        if os.path.isfile("linglong.yaml"):
             yaml_files.append("linglong.yaml")
 
-        # 查找架构子目录中的YAML文件
-        for arch_dir in ["amd64", "arm64", "sw64", "riscv64", "loong64", "mips64"]:
-            arch_yaml = Path(arch_dir) / "linglong.yaml"
-            if arch_yaml.exists():
-                yaml_files.append(str(arch_yaml))
+        # 查找架构子目录中的YAML文件（一次遍历当前目录，不限定架构名）
+        with os.scandir(".") as entries:
+            arch_dirs = sorted(
+                entry.name for entry in entries if entry.is_dir(follow_symlinks=False)
+            )
+        for arch_dir in arch_dirs:
+            arch_yaml = os.path.join(arch_dir, "linglong.yaml")
+            if os.path.isfile(arch_yaml):
+                yaml_files.append(arch_yaml)
 
         return yaml_files
 
+    def write_github_output(self, **outputs):
+        """将输出一次性追加写入GitHub Actions的GITHUB_OUTPUT文件"""
+        if "GITHUB_OUTPUT" not in os.environ:
+            return
+
+        output_file = os.environ["GITHUB_OUTPUT"] or "/tmp/output.txt"
+        payload = "".join(f"{key}={value}\n" for key, value in outputs.items())
+        with open(output_file, "a") as f:
+            f.write(payload)
+
     def run(self):
         """运行更新检查"""
         print(f"开始检查 {self.app_name} 更新...")
+        self._today = datetime.now().strftime("%m%d")
 
         # 获取最新版本
         latest_version = self.fetch_latest_version()
@@ -424,22 +562,15 @@ class UpdateChecker:
             if github_url:
                 print(f"使用GitHub release URL更新: {github_url}")
                 # 更新每个YAML文件
-                success_count = 0
-                for yaml_file in yaml_files:
-                    print(f"\n处理 {yaml_file}...")
-                    if self.update_yaml_file_with_github_url(
-                        yaml_file, latest_version, github_url
-                    ):
-                        success_count += 1
+                success_count = self.update_yaml_files(
+                    yaml_files, latest_version, github_url
+                )
 
                 if success_count > 0:
                     print(
                         f"\n使用GitHub URL更新完成！成功更新了 {success_count} 个文件。"
                     )
-                    if "GITHUB_OUTPUT" in os.environ or os.environ.get("GITHUB_OUTPUT"):
-                        output_file = os.environ.get("GITHUB_OUTPUT", "/tmp/output.txt")
-                        with open(output_file, "a") as f:
-                            f.write("has_changes=true\n")
+                    self.write_github_output(has_changes="true")
                     return 0
                 else:
                     print("\n使用GitHub URL更新失败！")
@@ -450,18 +581,13 @@ class UpdateChecker:
 
         # 普通模式：获取下载URL并输出信息给workflow
         # 构建下载URL
-        download_url = self.download_url_template.format(
-            version=latest_version, arch="amd64"
-        )
+        download_url = self._make_download_url(version=latest_version, arch="amd64")
         print(f"下载URL: {download_url}")
 
         # 输出信息给GitHub Actions
-        if "GITHUB_OUTPUT" in os.environ or os.environ.get("GITHUB_OUTPUT"):
-            output_file = os.environ.get("GITHUB_OUTPUT", "/tmp/output.txt")
-            with open(output_file, "a") as f:
-                f.write(f"has_changes=true\n")
-                f.write(f"new_version={latest_version}\n")
-                f.write(f"download_url={download_url}\n")
+        self.write_github_output(
+            has_changes="true", new_version=latest_version, download_url=download_url
+        )
 
         return 0
 